@@ -1,82 +1,112 @@
 import sys
 import os
-import pandas as pd
+import argparse
 import numpy as np
 import matplotlib.pyplot as plt
-from sklearn.decomposition import PCA
+from matplotlib.collections import LineCollection
 
 # Add parent directory to Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 # Import utility functions
-from utils.utils import snv, vector_normalization
-
-preprocess_type = 'snv'  # Choose 'snv' or 'vector_normalization'
-
-# Load the corn spectra data
-spectra_df = pd.read_csv('corn_m5spec.csv', sep=',')
-
-# Apply SNV normalization to the spectral data
-if preprocess_type == 'snv':
-    spectra_processed_df = snv(spectra_df)
-elif preprocess_type == 'vector_normalization':
-    spectra_processed_df = vector_normalization(spectra_df)
-else:
-    spectra_processed_df = spectra_df.copy()
-
-# Plot spectral data - spectras are in rows 
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
-
-# Left subplot: Raw spectra
-for i in range(spectra_df.shape[0]):
-    ax1.plot(spectra_df.iloc[i], label=f'Sample {i+1}', alpha=0.5)
-ax1.set_title('Raw Spectral Data')
-ax1.set_xlabel('Wavelength Index')
-ax1.set_ylabel('Reflectance')
-ax1.grid()
-# Set x-ticks every 100 variables
-ax1.set_xticks(range(0, spectra_df.shape[1], 100))
-
-# Right subplot: Processed spectra
-for i in range(spectra_processed_df.shape[0]):
-    ax2.plot(spectra_processed_df.iloc[i], label=f'Sample {i+1}', alpha=0.5)
-ax2.set_title(f'Processed Spectral Data ({preprocess_type.upper()})')
-ax2.set_xlabel('Wavelength Index')
-ax2.set_ylabel('Reflectance')
-ax2.grid()
-# Set x-ticks every 100 variables
-ax2.set_xticks(range(0, spectra_processed_df.shape[1], 100))
-
-plt.tight_layout()
-plt.show()
-
-pca = PCA(n_components=2)
-scores = pca.fit_transform(spectra_processed_df)
-
-# Plot PCA scores and loadings in subplots
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
-
-# Left subplot: PCA scores
-ax1.scatter(scores[:, 0], scores[:, 1])
-for i, txt in enumerate(spectra_processed_df.index):
-    ax1.annotate(txt, (scores[i, 0], scores[i, 1]), fontsize=8)
-ax1.set_title('PCA Scores of Corn Spectral Data')
-ax1.set_xlabel('PCA Component 1')
-ax1.set_ylabel('PCA Component 2')
-ax1.grid()
-
-# Right subplot: PCA loadings
-loadings = pca.components_.T * np.sqrt(pca.explained_variance_)
-ax2.plot(range(len(loadings)), loadings[:, 0], label='PC1 Loadings', linewidth=2)
-ax2.plot(range(len(loadings)), loadings[:, 1], label='PC2 Loadings', linewidth=2)
-ax2.set_title('PCA Loadings')
-ax2.set_xlabel('Wavelength Index')
-ax2.set_ylabel('Loading Value')
-ax2.legend()
-ax2.grid()
-# Set x-ticks every 100 variables
-ax2.set_xticks(range(0, len(loadings), 100))
-
-plt.tight_layout()
-plt.show()
-
-# print(md_clean)
\ No newline at end of file
+from utils.utils import load_corn, snv, vector_normalization, pca_svd
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corn_m5spec.csv')
+
+def spectra_collection(A):
+    """Build a single LineCollection holding one polyline per spectrum (row)"""
+    x = np.arange(A.shape[1])
+    segments = [np.column_stack([x, row]) for row in A]
+    colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+    return LineCollection(segments, colors=colors, alpha=0.5)
+
+def main(preprocess='snv', n_components=2, max_annotations=100, show=True):
+    """Run PCA on the corn spectra and plot spectra, scores and loadings
+
+    Args:
+        preprocess: 'snv', 'vector_normalization' or 'none'
+        n_components: Number of principal components (at least 2)
+        max_annotations: Skip per-sample score labels above this many samples
+        show: Display the figures (disable when batching runs)
+
+    Returns:
+        Tuple (scores, loadings)
+    """
+    # Load the corn spectra data
+    spectra_df = load_corn(DATA_PATH)
+
+    # Apply SNV normalization to the spectral data
+    if preprocess == 'snv':
+        spectra_processed_df = snv(spectra_df)
+    elif preprocess == 'vector_normalization':
+        spectra_processed_df = vector_normalization(spectra_df)
+    else:
+        spectra_processed_df = spectra_df.copy()
+
+    # Plot spectral data - spectras are in rows 
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+
+    # Left subplot: Raw spectra
+    ax1.add_collection(spectra_collection(spectra_df.values))
+    ax1.autoscale()
+    ax1.set_title('Raw Spectral Data')
+    ax1.set_xlabel('Wavelength Index')
+    ax1.set_ylabel('Reflectance')
+    ax1.grid()
+    # Set x-ticks every 100 variables
+    ax1.set_xticks(range(0, spectra_df.shape[1], 100))
+
+    # Right subplot: Processed spectra
+    ax2.add_collection(spectra_collection(spectra_processed_df.values))
+    ax2.autoscale()
+    ax2.set_title(f'Processed Spectral Data ({preprocess.upper()})')
+    ax2.set_xlabel('Wavelength Index')
+    ax2.set_ylabel('Reflectance')
+    ax2.grid()
+    # Set x-ticks every 100 variables
+    ax2.set_xticks(range(0, spectra_processed_df.shape[1], 100))
+
+    plt.tight_layout()
+    if show:
+        plt.show()
+
+    scores, components, explained_variance, _ = pca_svd(spectra_processed_df, n_components=n_components)
+
+    # Plot PCA scores and loadings in subplots
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+
+    # Left subplot: PCA scores
+    ax1.scatter(scores[:, 0], scores[:, 1])
+    # Annotating every point costs one Text artist each; skip for large sample counts
+    if len(scores) <= max_annotations:
+        for txt, xy in zip(spectra_processed_df.index, scores[:, :2]):
+            ax1.annotate(str(txt), xy, fontsize=8)
+    ax1.set_title('PCA Scores of Corn Spectral Data')
+    ax1.set_xlabel('PCA Component 1')
+    ax1.set_ylabel('PCA Component 2')
+    ax1.grid()
+
+    # Right subplot: PCA loadings
+    loadings = components.T * np.sqrt(explained_variance)
+    ax2.plot(range(len(loadings)), loadings[:, 0], label='PC1 Loadings', linewidth=2)
+    ax2.plot(range(len(loadings)), loadings[:, 1], label='PC2 Loadings', linewidth=2)
+    ax2.set_title('PCA Loadings')
+    ax2.set_xlabel('Wavelength Index')
+    ax2.set_ylabel('Loading Value')
+    ax2.legend()
+    ax2.grid()
+    # Set x-ticks every 100 variables
+    ax2.set_xticks(range(0, len(loadings), 100))
+
+    plt.tight_layout()
+    if show:
+        plt.show()
+
+    return scores, loadings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='PCA on corn NIR spectra')
+    parser.add_argument('--preprocess', default='snv', choices=['snv', 'vector_normalization', 'none'])
+    parser.add_argument('--n-components', type=int, default=2)
+    parser.add_argument('--max-annotations', type=int, default=100)
+    args = parser.parse_args()
+    main(preprocess=args.preprocess, n_components=args.n_components, max_annotations=args.max_annotations)
@@ -1,31 +1,53 @@
 import sys
 import os
-import pandas as pd
-from sklearn.decomposition import PCA
+import argparse
 import matplotlib.pyplot as plt
 
 # Add parent directory to Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 # Import utility functions
-from utils.utils import snv, calculate_rss, calculate_mahalanobis_distance
-
-# Load and preprocess the corn spectra data
-spectra_df = pd.read_csv('corn_m5spec.csv', sep=',')
-spectra_processed_df = snv(spectra_df)
-
-# Fit PCA model
-pca = PCA(n_components=2)
-scores = pca.fit_transform(spectra_processed_df)
-
-# Calculate RSS and Mahalanobis distance
-md_values = calculate_mahalanobis_distance(scores)
-rss_values = calculate_rss(spectra_processed_df, pca, scores)
-
-# Make a scatter plot of RSS vs. md 
-plt.figure(figsize=(10, 6))
-plt.scatter(rss_values, md_values, alpha=0.7)
-plt.title('RSS vs. Mahalanobis Distance')
-plt.xlabel('Residual Sum of Squares (RSS)')
-plt.ylabel('Mahalanobis Distance')
-plt.grid()
-plt.show()
+from utils.utils import load_corn, snv, vector_normalization, pca_svd, calculate_rss_and_mahalanobis
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corn_m5spec.csv')
+
+def main(preprocess='snv', n_components=2, show=True):
+    """Plot RSS against Mahalanobis distance for a PCA model of the corn spectra
+
+    Returns:
+        Tuple (rss_values, md_values)
+    """
+    # Load and preprocess the corn spectra data
+    spectra_df = load_corn(DATA_PATH)
+    if preprocess == 'snv':
+        spectra_processed_df = snv(spectra_df)
+    elif preprocess == 'vector_normalization':
+        spectra_processed_df = vector_normalization(spectra_df)
+    else:
+        spectra_processed_df = spectra_df.copy()
+
+    # Fit PCA model
+    scores, components, _, mean = pca_svd(spectra_processed_df, n_components=n_components)
+
+    # Calculate RSS and Mahalanobis distance
+    reconstructed = scores @ components
+    reconstructed += mean
+    rss_values, md_values = calculate_rss_and_mahalanobis(spectra_processed_df, reconstructed, scores)
+
+    # Make a scatter plot of RSS vs. md 
+    plt.figure(figsize=(10, 6))
+    plt.scatter(rss_values, md_values, alpha=0.7)
+    plt.title('RSS vs. Mahalanobis Distance')
+    plt.xlabel('Residual Sum of Squares (RSS)')
+    plt.ylabel('Mahalanobis Distance')
+    plt.grid()
+    if show:
+        plt.show()
+
+    return rss_values, md_values
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='RSS vs. Mahalanobis distance for corn NIR spectra')
+    parser.add_argument('--preprocess', default='snv', choices=['snv', 'vector_normalization', 'none'])
+    parser.add_argument('--n-components', type=int, default=2)
+    args = parser.parse_args()
+    main(preprocess=args.preprocess, n_components=args.n_components)
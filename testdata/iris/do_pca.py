@@ -1,63 +1,85 @@
 import sys
 import os
+import argparse
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from sklearn.decomposition import PCA
 from sklearn.preprocessing import StandardScaler
 
-# Load the iris dataset
-iris_df = pd.read_csv('iris.csv', index_col=0)
-
-# Use StandardScaler to normalize the data
-scaler = StandardScaler()
-iris_df.iloc[:, :4] = scaler.fit_transform(iris_df.iloc[:, :4])
-
-# Perform PCA on the first four columns (features)
-pca = PCA(n_components=2)
-scores = pca.fit_transform(iris_df.iloc[:, :4])
-
-# Plot PCA scores and loadings in subplots
-fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
-
-# Left subplot: PCA scores
-# Get unique species and assign colors
-species = iris_df['species']
-unique_species = species.unique()
-colors = ['red', 'blue', 'green']
-color_map = dict(zip(unique_species, colors))
-
-# Create scatter plot with colors based on species
-for i, spec in enumerate(unique_species):
-    mask = species == spec
-    ax1.scatter(scores[mask, 0], scores[mask, 1], 
-               c=colors[i], label=spec, alpha=0.7)
-
-# Add annotations for sample indices
-for i, txt in enumerate(iris_df.index):
-    ax1.annotate(txt, (scores[i, 0], scores[i, 1]), fontsize=6, alpha=0.7)
-
-ax1.set_title('PCA Scores of Iris Data')
-ax1.set_xlabel('PCA Component 1')
-ax1.set_ylabel('PCA Component 2')
-ax1.legend()
-ax1.grid()
-
-# Right subplot: PCA loadings
-loadings = pca.components_.T * np.sqrt(pca.explained_variance_)
-ax2.bar(range(len(loadings)), loadings[:, 0], label='PC1 Loadings', alpha=0.7)
-ax2.bar(range(len(loadings)), loadings[:, 1], label='PC2 Loadings', alpha=0.7)
-ax2.set_title('PCA Loadings')
-ax2.set_xlabel('Feature Index')
-ax2.set_ylabel('Loading Value')
-ax2.legend()
-ax2.grid()
-
-plt.tight_layout()
-plt.show()
-
-# Print captured variance in each component
-print("Explained variance by PCA components:")
-for i, var in enumerate(pca.explained_variance_ratio_):
-    print(f"Component {i+1}: {var:.2f}")
-print(f"Total variance captured: {np.sum(pca.explained_variance_ratio_):.2f}")
\ No newline at end of file
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'iris.csv')
+
+def main(n_components=2, solver='auto', max_annotations=100, show=True):
+    """Run PCA on the autoscaled iris data and plot scores and loadings
+
+    Returns:
+        Tuple (scores, loadings)
+    """
+    # Load the iris dataset
+    iris_df = pd.read_csv(DATA_PATH, index_col=0)
+    iris_df = iris_df.astype({col: np.float32 for col in iris_df.columns[:4]})
+
+    # Use StandardScaler to normalize the data
+    scaler = StandardScaler()
+    iris_df.iloc[:, :4] = scaler.fit_transform(iris_df.iloc[:, :4])
+
+    # Perform PCA on the first four columns (features)
+    pca = PCA(n_components=n_components, svd_solver=solver)
+    scores = pca.fit_transform(iris_df.iloc[:, :4])
+
+    # Plot PCA scores and loadings in subplots
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
+
+    # Left subplot: PCA scores
+    # Get unique species and assign colors
+    species = iris_df['species']
+    unique_species = species.unique()
+    colors = ['red', 'blue', 'green']
+    color_map = dict(zip(unique_species, colors))
+
+    # Create scatter plot with colors based on species
+    for i, spec in enumerate(unique_species):
+        mask = species == spec
+        ax1.scatter(scores[mask, 0], scores[mask, 1], 
+                   c=colors[i], label=spec, alpha=0.7)
+
+    # Add annotations for sample indices (one Text artist each, so skip for large data)
+    if len(scores) <= max_annotations:
+        for txt, xy in zip(iris_df.index, scores[:, :2]):
+            ax1.annotate(str(txt), xy, fontsize=6, alpha=0.7)
+
+    ax1.set_title('PCA Scores of Iris Data')
+    ax1.set_xlabel('PCA Component 1')
+    ax1.set_ylabel('PCA Component 2')
+    ax1.legend()
+    ax1.grid()
+
+    # Right subplot: PCA loadings
+    loadings = pca.components_.T * np.sqrt(pca.explained_variance_)
+    ax2.bar(range(len(loadings)), loadings[:, 0], label='PC1 Loadings', alpha=0.7)
+    ax2.bar(range(len(loadings)), loadings[:, 1], label='PC2 Loadings', alpha=0.7)
+    ax2.set_title('PCA Loadings')
+    ax2.set_xlabel('Feature Index')
+    ax2.set_ylabel('Loading Value')
+    ax2.legend()
+    ax2.grid()
+
+    plt.tight_layout()
+    if show:
+        plt.show()
+
+    # Print captured variance in each component
+    print("Explained variance by PCA components:")
+    for i, var in enumerate(pca.explained_variance_ratio_):
+        print(f"Component {i+1}: {var:.2f}")
+    print(f"Total variance captured: {np.sum(pca.explained_variance_ratio_):.2f}")
+
+    return scores, loadings
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='PCA on the iris data')
+    parser.add_argument('--n-components', type=int, default=2)
+    parser.add_argument('--solver', default='auto', choices=['auto', 'full', 'covariance_eigh', 'arpack', 'randomized'])
+    parser.add_argument('--max-annotations', type=int, default=100)
+    args = parser.parse_args()
+    main(n_components=args.n_components, solver=args.solver, max_annotations=args.max_annotations)
@@ -1,6 +1,7 @@
 import sys
 import os
-import pandas as pd
+import argparse
+import numpy as np
 from sklearn.decomposition import PCA
 from sklearn.preprocessing import StandardScaler
 import matplotlib.pyplot as plt
@@ -8,28 +9,48 @@ import matplotlib.pyplot as plt
 # Add parent directory to Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 # Import utility functions
-from utils.utils import snv, calculate_rss, calculate_mahalanobis_distance
-
-# Load the iris dataset
-iris_df = pd.read_csv('iris.csv', index_col=0)
-
-# Use StandardScaler to normalize the data
-#scaler = StandardScaler()
-#iris_df.iloc[:, :4] = scaler.fit_transform(iris_df.iloc[:, :4])
-
-# Perform PCA on the first four columns (features)
-pca = PCA(n_components=2)
-scores = pca.fit_transform(iris_df.iloc[:, :4])
-
-# Calculate RSS and Mahalanobis distance
-md_values = calculate_mahalanobis_distance(scores)
-rss_values = calculate_rss(iris_df.iloc[:, :4], pca, scores)
-
-# Make a scatter plot of RSS vs. md 
-plt.figure(figsize=(10, 6))
-plt.scatter(rss_values, md_values, alpha=0.7)
-plt.title('RSS vs. Mahalanobis Distance')
-plt.xlabel('Residual Sum of Squares (RSS)')
-plt.ylabel('Mahalanobis Distance')
-plt.grid()
-plt.show()
+from utils.utils import snv, read_csv, calculate_rss_and_mahalanobis
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'iris.csv')
+
+def main(n_components=2, solver='auto', show=True):
+    """Plot RSS against Mahalanobis distance for a PCA model of the iris data
+
+    Returns:
+        Tuple (rss_values, md_values)
+    """
+    # Load the iris dataset
+    iris_df = read_csv(DATA_PATH, index_col=0)
+    iris_df = iris_df.astype({col: np.float32 for col in iris_df.columns[:4]})
+
+    # Use StandardScaler to normalize the data
+    #scaler = StandardScaler()
+    #iris_df.iloc[:, :4] = scaler.fit_transform(iris_df.iloc[:, :4])
+
+    # Perform PCA on the first four columns (features)
+    pca = PCA(n_components=n_components, svd_solver=solver)
+    scores = pca.fit_transform(iris_df.iloc[:, :4])
+
+    # Calculate RSS and Mahalanobis distance
+    reconstructed = scores @ pca.components_
+    reconstructed += pca.mean_
+    rss_values, md_values = calculate_rss_and_mahalanobis(iris_df.iloc[:, :4], reconstructed, scores)
+
+    # Make a scatter plot of RSS vs. md 
+    plt.figure(figsize=(10, 6))
+    plt.scatter(rss_values, md_values, alpha=0.7)
+    plt.title('RSS vs. Mahalanobis Distance')
+    plt.xlabel('Residual Sum of Squares (RSS)')
+    plt.ylabel('Mahalanobis Distance')
+    plt.grid()
+    if show:
+        plt.show()
+
+    return rss_values, md_values
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='RSS vs. Mahalanobis distance for the iris data')
+    parser.add_argument('--n-components', type=int, default=2)
+    parser.add_argument('--solver', default='auto', choices=['auto', 'full', 'covariance_eigh', 'arpack', 'randomized'])
+    args = parser.parse_args()
+    main(n_components=args.n_components, solver=args.solver)
@@ -8,7 +8,6 @@ import pandas as pd
 import numpy as np
 from sklearn.decomposition import PCA
 from sklearn.preprocessing import StandardScaler
-from sklearn.impute import SimpleImputer
 import json
 
 def analyze_missing_data(df):
@@ -38,6 +37,23 @@ def analyze_missing_data(df):
     
     return missing_counts, total_missing
 
+def standardize_inplace(A):
+    """Autoscale columns in place (same result as StandardScaler, ddof=0)
+    
+    Sum and sum of squares are collected in a single pass over the data.
+    """
+    n = A.shape[0]
+    # Accumulate moments in float64 even when A is stored as float32
+    s = A.sum(axis=0, dtype=np.float64)
+    ss = np.einsum('ij,ij->j', A, A, dtype=np.float64)
+    mu = s / n
+    var = np.maximum(ss / n - mu * mu, 0.0)
+    sd = np.sqrt(var)
+    sd[sd == 0.0] = 1.0
+    A -= mu.astype(A.dtype)
+    A /= sd.astype(A.dtype)
+    return A
+
 def pca_with_drop_strategy(df_numeric, df_categorical):
     """PCA with drop rows strategy (like GoPCA drop)"""
     print("\n" + "=" * 60)
@@ -47,12 +63,12 @@ def pca_with_drop_strategy(df_numeric, df_categorical):
     # Drop rows with any NaN
     print(f"Original shape: {df_numeric.shape}")
     
-    # Get indices of rows without NaN
-    valid_indices = ~df_numeric.isnull().any(axis=1)
-    df_clean = df_numeric[valid_indices]
+    # Get mask of rows without NaN (single C scan, no intermediate boolean frame)
+    valid_indices = ~np.isnan(df_numeric.to_numpy()).any(axis=1)
+    df_clean = df_numeric.iloc[valid_indices]
     
     # CRITICAL: Also filter categorical data to match!
-    df_cat_clean = df_categorical[valid_indices] if df_categorical is not None else None
+    df_cat_clean = df_categorical.iloc[valid_indices] if df_categorical is not None else None
     
     print(f"After dropping NaN rows: {df_clean.shape}")
     print(f"Rows dropped: {len(df_numeric) - len(df_clean):,}")
@@ -62,11 +78,10 @@ def pca_with_drop_strategy(df_numeric, df_categorical):
         return None, None, None
     
     # Standardize
-    scaler = StandardScaler()
-    scaled_data = scaler.fit_transform(df_clean)
+    scaled_data = standardize_inplace(df_clean.to_numpy(dtype=np.float32, copy=True))
     
     # Run PCA
-    pca = PCA(n_components=2)
+    pca = PCA(n_components=2, svd_solver='randomized', random_state=0)
     scores = pca.fit_transform(scaled_data)
     
     print(f"\nPCA Results:")
@@ -91,22 +106,23 @@ def pca_with_mean_imputation(df_numeric):
     print(f"Original shape: {df_numeric.shape}")
     
     # Impute missing values with column means
-    imputer = SimpleImputer(strategy='mean')
-    imputed_data = imputer.fit_transform(df_numeric)
+    imputed_data = df_numeric.to_numpy(dtype=np.float32, copy=True)
+    col_mean = np.nanmean(imputed_data, axis=0, dtype=np.float64).astype(np.float32)
+    missing = np.isnan(imputed_data)
+    idx = np.where(missing)
+    imputed_data[idx] = np.take(col_mean, idx[1])
     
     print(f"After imputation: {imputed_data.shape}")
     print("Column means used for imputation:")
     for i, col in enumerate(df_numeric.columns):
-        if df_numeric[col].isnull().any():
-            mean_val = imputer.statistics_[i]
-            print(f"  {col}: {mean_val:.3f}")
+        if missing[:, i].any():
+            print(f"  {col}: {col_mean[i]:.3f}")
     
     # Standardize
-    scaler = StandardScaler()
-    scaled_data = scaler.fit_transform(imputed_data)
+    scaled_data = standardize_inplace(imputed_data)
     
     # Run PCA
-    pca = PCA(n_components=2)
+    pca = PCA(n_components=2, svd_solver='randomized', random_state=0)
     scores = pca.fit_transform(scaled_data)
     
     print(f"\nPCA Results:")
@@ -119,7 +135,11 @@ def pca_with_mean_imputation(df_numeric):
 def main():
     # Load data
     print("Loading met_kikut_aarhus.csv...")
-    df = pd.read_csv("met_kikut_aarhus.csv", index_col=0, parse_dates=True)
+    try:
+        # pyarrow's multi-threaded tokenizer is much faster on this CSV
+        df = pd.read_csv("met_kikut_aarhus.csv", index_col=0, parse_dates=True, engine='pyarrow')
+    except ImportError:
+        df = pd.read_csv("met_kikut_aarhus.csv", index_col=0, parse_dates=True)
     
     print(f"Full dataset shape: {df.shape}")
     print(f"Columns: {list(df.columns)}")
@@ -128,7 +148,8 @@ def main():
     categorical_cols = ['month']
     numeric_cols = [col for col in df.columns if col not in categorical_cols]
     
-    df_numeric = df[numeric_cols]
+    # float32 is plenty for the met measurements and halves memory traffic
+    df_numeric = df[numeric_cols].astype(np.float32)
     df_categorical = df[categorical_cols]
     
     print(f"\nNumeric columns: {numeric_cols}")
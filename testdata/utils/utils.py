@@ -1,6 +1,34 @@
+import os
 import pandas as pd
 import numpy as np
-from scipy.spatial.distance import mahalanobis
+from scipy.linalg import cho_factor, cho_solve, cholesky, solve_triangular, svd
+from scipy.sparse import issparse
+
+def read_csv(path: str, **kwargs) -> pd.DataFrame:
+    '''pd.read_csv using the multi-threaded pyarrow engine when it is available'''
+    try:
+        return pd.read_csv(path, engine='pyarrow', **kwargs)
+    except ImportError:
+        return pd.read_csv(path, **kwargs)
+
+def load_corn(path: str = 'corn_m5spec.csv') -> pd.DataFrame:
+    '''Load a corn spectra CSV, caching the parsed values as float32 .npz
+
+    The cache sits next to the CSV and is rebuilt whenever the CSV is newer.
+    It is only an optimization: if it cannot be written (e.g. a read-only
+    data directory) the freshly parsed frame is returned as is.
+    '''
+    cache = os.path.splitext(path)[0] + '.npz'
+    if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(path):
+        with np.load(cache, allow_pickle=False) as d:
+            return pd.DataFrame(data=d['values'], columns=d['columns'])
+    df = read_csv(path, sep=',')
+    values = df.values.astype(np.float32)
+    try:
+        np.savez(cache, values=values, columns=df.columns.to_numpy(dtype=str))
+    except OSError:
+        pass
+    return pd.DataFrame(data=values, columns=df.columns)
 
 def snv(X:pd.DataFrame) -> pd.DataFrame:
     '''Standard Normal Variate
@@ -10,16 +38,60 @@ def snv(X:pd.DataFrame) -> pd.DataFrame:
       Diffuse Reflectance Spectra. Applied Spectroscopy, 43(5), 772–777. 
       https://doi.org/10.1366/0003702894202201
     '''
-    sample_mean = X.mean(axis=1)
-    sample_std = X.std(axis=1)
-    X_new = ((X.T - sample_mean)/sample_std).T
+    # Statistics are accumulated in float64; the output keeps a float32 input's dtype
+    out_dtype = np.float32 if X.values.dtype == np.float32 else np.float64
+    A = X.values.astype(np.float64, copy=False)
+    n = A.shape[1]
+    # Single pass for sum and sum of squares: var = (sum(x^2) - sum(x)*mean) / (n - 1)
+    s = A.sum(axis=1, keepdims=True)
+    ss = np.einsum('ij,ij->i', A, A)[:, None]
+    sample_mean = s / n
+    sample_var = np.maximum((ss - s * sample_mean) / (n - 1), 0.0)
+    sample_std = np.sqrt(sample_var)
+    X_new = ((A - sample_mean) / sample_std).astype(out_dtype, copy=False)
     return pd.DataFrame(data=X_new, index=X.index, columns=X.columns)
 
 # Define a function for Vector Normalization (L2 Norm)
 def vector_normalization(X: pd.DataFrame) -> pd.DataFrame:
     """Vector Normalization (L2 Norm)"""
-    norm = np.linalg.norm(X, axis=1, keepdims=True)
-    return X.div(norm, axis=0)
+    if issparse(X):
+        # CSR/CSC input is normalized row-wise in a single C pass
+        from sklearn.preprocessing import normalize
+        return normalize(X, norm='l2')
+    # Copy once so the in-place divide never touches the caller's frame;
+    # like snv, a float32 input keeps its dtype
+    A = X.to_numpy(copy=True)
+    if A.dtype != np.float32:
+        A = A.astype(np.float64, copy=False)
+    norm = np.linalg.norm(A, axis=1, keepdims=True)
+    np.divide(A, norm, out=A)
+    return pd.DataFrame(data=A, index=X.index, columns=X.columns)
+
+def pca_svd(X, n_components=2):
+    '''PCA via a single LAPACK divide-and-conquer SVD of the centered data
+    
+    Signs follow scikit-learn's convention (largest loading of each
+    component is positive).
+    
+    Args:
+        X: Preprocessed data (samples in rows)
+        n_components: Number of principal components to keep
+    
+    Returns:
+        Tuple (scores, components, explained_variance, mean)
+    '''
+    A = np.asarray(X.values if hasattr(X, 'values') else X)
+    mean = A.mean(axis=0)
+    # Xc is a fresh array, so LAPACK may overwrite it in place
+    Xc = A - mean
+    U, s, Vt = svd(Xc, full_matrices=False, lapack_driver='gesdd', overwrite_a=True)
+    signs = np.sign(Vt[np.arange(Vt.shape[0]), np.argmax(np.abs(Vt), axis=1)])
+    U *= signs
+    Vt *= signs[:, None]
+    scores = U[:, :n_components] * s[:n_components]
+    components = Vt[:n_components]
+    explained_variance = (s[:n_components] ** 2) / (A.shape[0] - 1)
+    return scores, components, explained_variance, mean
 
 def calculate_rss(original_data, pca_model, pca_scores):
     '''Calculate Residual Sum of Squares (RSS) for PCA reconstruction
@@ -35,29 +107,139 @@ def calculate_rss(original_data, pca_model, pca_scores):
     Returns:
         List of RSS values for each sample
     '''
-    # Reconstruct the data using PCA inverse transform
-    reconstructed_data = pca_model.inverse_transform(pca_scores)
+    X = np.ascontiguousarray(original_data.values if hasattr(original_data, 'values') else original_data)
+    if getattr(pca_model, 'whiten', False):
+        # Whitened scores need the model's own rescaling
+        reconstructed_data = pca_model.inverse_transform(pca_scores)
+        return calculate_rss_from_reconstruction(X, reconstructed_data).tolist()
+    return calculate_rss_from_components(X, pca_scores, pca_model.components_, pca_model.mean_).tolist()
+
+def calculate_rss_from_components(X_arr, scores, components, mean):
+    '''Calculate RSS by reconstructing directly from PCA components
+    
+    Equivalent to using pca_model.inverse_transform for a non-whitened model,
+    but skips the estimator's input validation.
     
-    # Calculate RSS for each sample (sum of squared residuals)
-    rss_list = []
-    for i in range(len(original_data)):
-        residuals = original_data.iloc[i] - reconstructed_data[i]
-        rss = np.sum(residuals ** 2)
-        rss_list.append(rss)
+    Args:
+        X_arr: Original preprocessed data as an ndarray
+        scores: PCA scores (transformed data)
+        components: Principal axes, shape (n_components, n_features)
+        mean: Per-feature mean removed before fitting
     
-    return [float(x) for x in rss_list]
+    Returns:
+        Array of RSS values for each sample
+    '''
+    reconstructed_data = scores @ components
+    reconstructed_data += mean
+    return calculate_rss_from_reconstruction(X_arr, reconstructed_data)
+
+def calculate_rss_from_reconstruction(X_arr, Xhat_arr, out=None):
+    '''Calculate RSS from a precomputed PCA reconstruction
+    
+    Args:
+        X_arr: Original preprocessed data as an ndarray
+        Xhat_arr: Reconstructed data, e.g. from pca_model.inverse_transform
+        out: Optional preallocated float64 array of length n_samples to
+            write the result into (reused across repeated calls)
+    
+    Returns:
+        Array of RSS values for each sample
+    '''
+    if out is None:
+        out = np.empty(X_arr.shape[0], dtype=np.float64)
+    # Calculate RSS for each sample (sum of squared residuals) in one pass
+    residuals = X_arr - Xhat_arr
+    return np.einsum('ij,ij->i', residuals, residuals, out=out)
 
 def calculate_mahalanobis_distance(scores):
     '''Calculate Mahalanobis distance for PCA scores
     
+    PCA scores are mean-centered by construction, so the centroid is taken
+    to be the origin.
+    
     Args:
         scores: PCA scores (transformed data)
     
     Returns:
         List of Mahalanobis distances for each sample
     '''
-    mean_vec = scores.mean(axis=0)
     cov = np.cov(scores, rowvar=False)
-    inv_covmat = np.linalg.inv(cov)
-    md = [mahalanobis(row, mean_vec, inv_covmat) for row in scores]
-    return [float(x) for x in md]
+    # Solve against the Cholesky factor rather than inverting the covariance
+    c_and_lower = cho_factor(cov, lower=True)
+    Y = cho_solve(c_and_lower, scores.T)
+    md = np.sqrt(np.sum(scores.T * Y, axis=0))
+    return md.tolist()
+
+def _rss_and_md_numpy(X, Xhat, D, L):
+    R = X - Xhat
+    rss = np.einsum('ij,ij->i', R, R)
+    # md = ||L^-1 d|| with cov = L L^T, no explicit inverse
+    W = solve_triangular(L, D.T, lower=True)
+    md = np.sqrt(np.einsum('ij,ij->j', W, W))
+    return rss, md
+
+# The Numba kernel only pays off once JIT and thread start-up are amortized;
+# below this many samples the NumPy path is much faster
+NUMBA_MIN_SAMPLES = 200_000
+
+_RSS_MD_KERNEL = None
+
+def _get_rss_and_md_numba():
+    '''Compile the Numba RSS/MD kernel on first use, or fall back to NumPy'''
+    global _RSS_MD_KERNEL
+    if _RSS_MD_KERNEL is None:
+        try:
+            import numba
+        except ImportError:  # numba is optional
+            _RSS_MD_KERNEL = _rss_and_md_numpy
+            return _RSS_MD_KERNEL
+
+        @numba.njit(parallel=True, fastmath=True, cache=True)
+        def _rss_and_md(X, Xhat, D, L):
+            n, k = D.shape
+            rss = np.empty(n)
+            md = np.empty(n)
+            for i in numba.prange(n):
+                r = X[i] - Xhat[i]
+                rss[i] = np.dot(r, r)
+                # Forward substitution L w = d
+                w = np.empty(k)
+                acc = 0.0
+                for a in range(k):
+                    t = D[i, a]
+                    for b in range(a):
+                        t -= L[a, b] * w[b]
+                    w[a] = t / L[a, a]
+                    acc += w[a] * w[a]
+                md[i] = np.sqrt(acc)
+            return rss, md
+
+        _RSS_MD_KERNEL = _rss_and_md
+    return _RSS_MD_KERNEL
+
+def calculate_rss_and_mahalanobis(original_data, reconstructed_data, scores, use_numba=None):
+    '''Calculate RSS and Mahalanobis distance in one fused pass
+    
+    Uses vectorized NumPy by default. A Numba kernel (imported and compiled
+    lazily) is used when use_numba is True, or when use_numba is None and
+    there are at least NUMBA_MIN_SAMPLES samples and numba is installed.
+    
+    Args:
+        original_data: Original preprocessed data
+        reconstructed_data: PCA reconstruction of the data
+        scores: PCA scores (transformed data)
+        use_numba: True/False to force the kernel choice, None for automatic
+    
+    Returns:
+        Tuple of arrays (rss, md) with one value per sample
+    '''
+    X = np.ascontiguousarray(original_data.values if hasattr(original_data, 'values') else original_data, dtype=np.float64)
+    Xhat = np.ascontiguousarray(reconstructed_data, dtype=np.float64)
+    # PCA scores are already mean-centered
+    D = np.ascontiguousarray(scores, dtype=np.float64)
+    cov = np.atleast_2d(np.cov(scores, rowvar=False))
+    L = cholesky(cov, lower=True)
+    if use_numba is None:
+        use_numba = D.shape[0] >= NUMBA_MIN_SAMPLES
+    kernel = _get_rss_and_md_numba() if use_numba else _rss_and_md_numpy
+    return kernel(X, Xhat, D, L)
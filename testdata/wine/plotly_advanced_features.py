@@ -13,74 +13,127 @@ import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
 from plotly.subplots import make_subplots
-from sklearn.decomposition import PCA
-from sklearn.preprocessing import StandardScaler
-from scipy.stats import gaussian_kde
-from scipy import stats
 import time
 import os
 
+# sklearn, scipy and numba are imported inside the functions that use them so
+# importing this module stays cheap.
+
 
 # Create output directory
 OUTPUT_DIR = 'plotly'
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Qualitative palette shared by all class-colored plots
+COLORS = px.colors.qualitative.Plotly
+
+# Resolve the dark template once instead of looking it up by name per figure
+DARK_TEMPLATE = pio.templates['plotly_dark']
+
+
+def _apply_common_layout(fig, width=800, height=600, **layout):
+    """Apply the dark template and default size shared by every demo figure."""
+    fig.update_layout(template=DARK_TEMPLATE, width=width, height=height, **layout)
+    return fig
+
 
 def get_output_path(filename):
     """Get the full path for output files in the plotly subdirectory."""
     return os.path.join(OUTPUT_DIR, filename)
 
 
-def load_data():
-    """Load and prepare wine dataset."""
-    df = pd.read_csv('wine.csv')
-    feature_cols = [col for col in df.columns if col not in ['classes', 'Unnamed: 0']]
-    X = df[feature_cols].values
-    y = df['classes'].values
+def load_data(n_components=4):
+    """Load and prepare wine dataset.
+    
+    PCA is fitted once with enough components for every demo; callers slice
+    the score columns they need (2D, 3D, animated PC pairs).
+    
+    Results are cached in a single .npz that records the CSV modification
+    time and component count; a mismatch rebuilds and overwrites it, so
+    repeated runs skip pandas and sklearn entirely.
+    """
+    csv_mtime = os.path.getmtime('wine.csv')
+    cache = '.wine_cache.npz'
+    if os.path.exists(cache):
+        with np.load(cache) as d:
+            if d['csv_mtime'] == csv_mtime and d['n_components'] == n_components:
+                return d['scores'], d['y']
+    
+    from sklearn.decomposition import PCA
+    from sklearn.preprocessing import StandardScaler
+    
+    # index_col=0 consumes the unnamed row-index column at parse time
+    df = pd.read_csv('wine.csv', index_col=0)
+    feature_cols = [col for col in df.columns if col != 'classes']
+    X = df[feature_cols].to_numpy(dtype=np.float64, copy=False)
+    y = df['classes'].to_numpy(dtype=str)
     
     scaler = StandardScaler()
     X_scaled = scaler.fit_transform(X)
     
-    pca = PCA(n_components=2)
+    pca = PCA(n_components=n_components)
     scores = pca.fit_transform(X_scaled)
     
-    return scores, y, pca.explained_variance_ratio_ * 100
+    np.savez(cache, scores=scores, y=y, csv_mtime=csv_mtime, n_components=n_components)
+    return scores, y
+
 
+def class_indices(y):
+    """Map each class label to the integer indices of its samples."""
+    classes, inverse = np.unique(y, return_inverse=True)
+    # A stable sort by class code groups the indices without rescanning y per class
+    order = np.argsort(inverse, kind='stable')
+    splits = np.cumsum(np.bincount(inverse, minlength=len(classes)))[:-1]
+    return dict(zip(classes, np.split(order, splits)))
 
-def create_webgl_comparison(scores, y):
+
+def class_columns(scores, groups):
+    """Per-class contiguous PC1/PC2(/PC3) arrays, laid out as a dict of arrays.
+    
+    Each array is copied once (advanced indexing with idx already returns a
+    new contiguous array) so downstream plots and density estimates read
+    contiguous 1D data instead of re-slicing the score matrix.
+    """
+    names = ('x', 'y', 'z')[:min(scores.shape[1], 3)]
+    return {
+        cls: {name: scores[idx, col] for col, name in enumerate(names)}
+        for cls, idx in groups.items()
+    }
+
+
+def create_webgl_comparison(scores, y, per_class=None, colors=COLORS):
     """Compare performance of scatter vs scattergl."""
     fig = make_subplots(
         rows=1, cols=2,
         subplot_titles=('Standard Scatter (SVG)', 'WebGL Scatter (GPU)')
     )
     
-    classes = np.unique(y)
-    colors = px.colors.qualitative.Plotly
+    if per_class is None:
+        per_class = class_columns(scores, class_indices(y))
     
     # Standard scatter
-    for i, cls in enumerate(classes):
-        mask = y == cls
+    for i, (cls, cols) in enumerate(per_class.items()):
         fig.add_trace(
             go.Scatter(
-                x=scores[mask, 0],
-                y=scores[mask, 1],
+                x=cols['x'],
+                y=cols['y'],
                 mode='markers',
                 name=cls,
                 marker=dict(size=8, color=colors[i]),
-                legendgroup=cls,
-                showlegend=True
+                legendgroup=cls
             ),
             row=1, col=1
         )
     
-    # WebGL scatter (scattergl)
-    for i, cls in enumerate(classes):
-        mask = y == cls
+    # WebGL scatter (scattergl). Plain lists avoid plotly.js's slow per-refresh
+    # clean-up of typed Float arrays in WebGL traces.
+    for i, (cls, cols) in enumerate(per_class.items()):
         fig.add_trace(
             go.Scattergl(  # Note: Scattergl for WebGL rendering
-                x=scores[mask, 0],
-                y=scores[mask, 1],
+                x=cols['x'].tolist(),
+                y=cols['y'].tolist(),
                 mode='markers',
                 name=cls,
                 marker=dict(size=8, color=colors[i]),
@@ -90,11 +143,11 @@ def create_webgl_comparison(scores, y):
             row=1, col=2
         )
     
-    fig.update_layout(
+    _apply_common_layout(
+        fig,
         title='WebGL Performance Comparison',
         height=500,
         width=1000,
-        template='plotly_dark',
         annotations=[
             dict(
                 text="Use scattergl for >1000 points",
@@ -109,50 +162,134 @@ def create_webgl_comparison(scores, y):
     return fig
 
 
-def create_density_contour_plot(scores, y):
-    """Create density contour plot for overlapping regions."""
+def binned_kde(x_data, y_data, x_edges, y_edges):
+    """2D Gaussian KDE approximated by smoothing a histogram on the grid.
+    
+    Points are binned with np.histogram2d and the counts are convolved with a
+    Gaussian whose bandwidth follows Scott's rule, which costs O(G log G) in
+    the grid size instead of O(N*G) for evaluating every point's kernel.
+    
+    Returns the density on the bin centers with shape (y, x).
+    """
+    from scipy.ndimage import gaussian_filter
+    
+    n = len(x_data)
+    factor = n ** (-1 / 6)  # Scott's rule for 2D data
+    h_x = factor * np.std(x_data, ddof=1)
+    h_y = factor * np.std(y_data, ddof=1)
+    
+    H, _, _ = np.histogram2d(x_data, y_data, bins=[x_edges, y_edges])
+    dx = x_edges[1] - x_edges[0]
+    dy = y_edges[1] - y_edges[0]
+    
+    density = gaussian_filter(H.T, sigma=(h_y / dy, h_x / dx), mode='constant')
+    density /= n * dx * dy
+    return density
+
+
+def _kde2d_numpy(x_data, y_data, xx, yy, inv_h2_x, inv_h2_y, norm):
+    density = np.empty(xx.shape)
+    # One grid row at a time keeps the temporary at (n_x, N) instead of (G, N)
+    for i in range(xx.shape[0]):
+        dx = xx[i][:, None] - x_data
+        dy = yy[i][:, None] - y_data
+        density[i] = np.exp(-0.5 * (dx * dx * inv_h2_x + dy * dy * inv_h2_y)).sum(axis=1)
+    return density * norm
+
+
+_KDE2D_KERNEL = None
+
+
+def _get_kde2d():
+    """Compile the Numba KDE kernel on first use, or fall back to NumPy."""
+    global _KDE2D_KERNEL
+    if _KDE2D_KERNEL is None:
+        try:
+            import numba
+        except ImportError:  # numba is optional
+            _KDE2D_KERNEL = _kde2d_numpy
+            return _KDE2D_KERNEL
+        
+        @numba.njit(parallel=True, fastmath=True, cache=True)
+        def _kde2d(x_data, y_data, xx, yy, inv_h2_x, inv_h2_y, norm):
+            density = np.zeros(xx.shape)
+            for i in numba.prange(xx.shape[0]):
+                for j in range(xx.shape[1]):
+                    acc = 0.0
+                    for k in range(x_data.size):
+                        dx = xx[i, j] - x_data[k]
+                        dy = yy[i, j] - y_data[k]
+                        acc += np.exp(-0.5 * (dx * dx * inv_h2_x + dy * dy * inv_h2_y))
+                    density[i, j] = acc * norm
+            return density
+        
+        _KDE2D_KERNEL = _kde2d
+    return _KDE2D_KERNEL
+
+
+def exact_kde(x_data, y_data, x_centers, y_centers):
+    """Exact 2D Gaussian KDE (diagonal Scott's rule bandwidth) on a grid.
+    
+    Uses a parallel Numba kernel when numba is installed, which accumulates
+    each grid point without an N x G temporary. Returns shape (y, x).
+    """
+    n = len(x_data)
+    factor = n ** (-1 / 6)  # Scott's rule for 2D data
+    h_x = factor * np.std(x_data, ddof=1)
+    h_y = factor * np.std(y_data, ddof=1)
+    norm = 1.0 / (2 * np.pi * h_x * h_y * n)
+    
+    xx, yy = np.meshgrid(x_centers, y_centers)
+    return _get_kde2d()(
+        np.ascontiguousarray(x_data, dtype=np.float64),
+        np.ascontiguousarray(y_data, dtype=np.float64),
+        xx, yy, 1.0 / h_x**2, 1.0 / h_y**2, norm
+    )
+
+
+def create_density_contour_plot(scores, y, per_class=None, colors=COLORS, method='binned'):
+    """Create density contour plot for overlapping regions.
+    
+    method='binned' smooths a histogram (fast approximation); method='exact'
+    evaluates the Gaussian kernel of every sample at every grid point.
+    """
     fig = go.Figure()
     
-    classes = np.unique(y)
-    colors = px.colors.qualitative.Plotly
+    if per_class is None:
+        per_class = class_columns(scores, class_indices(y))
     
     # Add scatter points
-    for i, cls in enumerate(classes):
-        mask = y == cls
+    for i, (cls, cols) in enumerate(per_class.items()):
         fig.add_trace(go.Scatter(
-            x=scores[mask, 0],
-            y=scores[mask, 1],
+            x=cols['x'],
+            y=cols['y'],
             mode='markers',
             name=cls,
             marker=dict(size=6, color=colors[i], opacity=0.6)
         ))
     
+    # Create one grid for density estimation, shared by all classes
+    x_edges = np.linspace(scores[:, 0].min() - 1, scores[:, 0].max() + 1, 51)
+    y_edges = np.linspace(scores[:, 1].min() - 1, scores[:, 1].max() + 1, 51)
+    x_centers = 0.5 * (x_edges[:-1] + x_edges[1:])
+    y_centers = 0.5 * (y_edges[:-1] + y_edges[1:])
+    
     # Add density contours for each class
-    for i, cls in enumerate(classes):
-        mask = y == cls
-        x_data = scores[mask, 0]
-        y_data = scores[mask, 1]
-        
-        # Create grid for density estimation
-        x_min, x_max = x_data.min() - 1, x_data.max() + 1
-        y_min, y_max = y_data.min() - 1, y_data.max() + 1
-        
-        xx, yy = np.meshgrid(
-            np.linspace(x_min, x_max, 50),
-            np.linspace(y_min, y_max, 50)
-        )
+    for i, (cls, cols) in enumerate(per_class.items()):
+        x_data = cols['x']
+        y_data = cols['y']
         
         # Kernel density estimation
         if len(x_data) > 3:  # Need enough points for KDE
-            positions = np.vstack([xx.ravel(), yy.ravel()])
-            values = np.vstack([x_data, y_data])
-            kernel = gaussian_kde(values)
-            density = np.reshape(kernel(positions).T, xx.shape)
+            if method == 'exact':
+                density = exact_kde(x_data, y_data, x_centers, y_centers)
+            else:
+                density = binned_kde(x_data, y_data, x_edges, y_edges)
             
             # Add contour
             fig.add_trace(go.Contour(
-                x=xx[0],
-                y=yy[:, 0],
+                x=x_centers,
+                y=y_centers,
                 z=density,
                 showscale=False,
                 colorscale=[[0, 'rgba(0,0,0,0)'], [1, colors[i]]],
@@ -167,13 +304,11 @@ def create_density_contour_plot(scores, y):
                 hoverinfo='skip'
             ))
     
-    fig.update_layout(
+    _apply_common_layout(
+        fig,
         title='PCA with Density Contours (2D KDE)',
         xaxis_title='PC1',
-        yaxis_title='PC2',
-        width=800,
-        height=600,
-        template='plotly_dark'
+        yaxis_title='PC2'
     )
     
     return fig
@@ -185,31 +320,29 @@ def create_lasso_selection_demo(scores, y):
     
     # Create single trace with all points
     fig.add_trace(go.Scattergl(
-        x=scores[:, 0],
-        y=scores[:, 1],
+        x=scores[:, 0].tolist(),
+        y=scores[:, 1].tolist(),
         mode='markers',
         marker=dict(
             size=8,
-            color=pd.Categorical(y).codes,
+            color=np.unique(y, return_inverse=True)[1],
             colorscale='Viridis',
             showscale=True,
             colorbar=dict(title="Class")
         ),
-        text=[f'Sample {i}<br>Class: {y[i]}' for i in range(len(y))],
-        hovertemplate='<b>%{text}</b><br>PC1: %{x:.2f}<br>PC2: %{y:.2f}<extra></extra>',
+        customdata=np.column_stack([np.arange(len(y)), y]),
+        hovertemplate='<b>Sample %{customdata[0]}<br>Class: %{customdata[1]}</b><br>PC1: %{x:.2f}<br>PC2: %{y:.2f}<extra></extra>',
         selectedpoints=[],  # Enable selection
         selected=dict(marker=dict(color='red', size=12)),
         unselected=dict(marker=dict(opacity=0.3))
     ))
     
     # Configure layout with selection tools
-    fig.update_layout(
+    _apply_common_layout(
+        fig,
         title='Lasso Selection Demo (Use lasso tool in modebar)',
         xaxis_title='PC1',
         yaxis_title='PC2',
-        width=800,
-        height=600,
-        template='plotly_dark',
         dragmode='lasso',  # Set default tool to lasso
         hovermode='closest',
         modebar=dict(
@@ -236,20 +369,19 @@ def create_lasso_selection_demo(scores, y):
     return fig, config
 
 
-def create_3d_with_density(scores_3d, y):
+def create_3d_with_density(scores_3d, y, per_class=None, colors=COLORS):
     """Create 3D plot with density projections."""
     fig = go.Figure()
     
-    classes = np.unique(y)
-    colors = px.colors.qualitative.Plotly
+    if per_class is None:
+        per_class = class_columns(scores_3d, class_indices(y))
     
     # Add 3D scatter
-    for i, cls in enumerate(classes):
-        mask = y == cls
+    for i, (cls, cols) in enumerate(per_class.items()):
         fig.add_trace(go.Scatter3d(
-            x=scores_3d[mask, 0],
-            y=scores_3d[mask, 1],
-            z=scores_3d[mask, 2],
+            x=cols['x'],
+            y=cols['y'],
+            z=cols['z'],
             mode='markers',
             name=cls,
             marker=dict(
@@ -263,7 +395,8 @@ def create_3d_with_density(scores_3d, y):
     # Add 2D projections as contours on the walls
     # This is conceptual - in practice would need more complex implementation
     
-    fig.update_layout(
+    _apply_common_layout(
+        fig,
         title='3D PCA with Projections',
         scene=dict(
             xaxis_title='PC1',
@@ -274,47 +407,36 @@ def create_3d_with_density(scores_3d, y):
                 center=dict(x=0, y=0, z=0)
             ),
             aspectmode='cube'
-        ),
-        width=800,
-        height=600,
-        template='plotly_dark'
+        )
     )
     
     return fig
 
 
-def create_animated_transitions():
-    """Create animated transitions between different PC combinations."""
-    # Load data
-    df = pd.read_csv('wine.csv')
-    feature_cols = [col for col in df.columns if col not in ['classes', 'Unnamed: 0']]
-    X = df[feature_cols].values
-    y = df['classes'].values
+def create_animated_transitions(scores, y, groups=None):
+    """Create animated transitions between different PC combinations.
     
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    
-    pca = PCA(n_components=4)
-    scores = pca.fit_transform(X_scaled)
+    Expects at least 4 score columns.
+    """
+    if groups is None:
+        groups = class_indices(y)
     
     # Create frames for animation
     frames = []
     pc_combinations = [(0,1), (0,2), (1,2), (0,3), (1,3), (2,3)]
     
+    # Frames only carry the changing x/y arrays; mode, name and marker are
+    # inherited from the initial traces they target
+    trace_ids = list(range(len(groups)))
     for pc1, pc2 in pc_combinations:
-        frame_data = []
-        for cls in np.unique(y):
-            mask = y == cls
-            frame_data.append(go.Scatter(
-                x=scores[mask, pc1],
-                y=scores[mask, pc2],
-                mode='markers',
-                name=cls,
-                marker=dict(size=8)
-            ))
+        frame_data = [
+            dict(x=scores[idx, pc1].tolist(), y=scores[idx, pc2].tolist())
+            for idx in groups.values()
+        ]
         
         frames.append(go.Frame(
             data=frame_data,
+            traces=trace_ids,
             name=f'PC{pc1+1} vs PC{pc2+1}',
             layout=go.Layout(
                 xaxis_title=f'PC{pc1+1}',
@@ -324,11 +446,10 @@ def create_animated_transitions():
     
     # Initial data
     initial_data = []
-    for cls in np.unique(y):
-        mask = y == cls
+    for cls, idx in groups.items():
         initial_data.append(go.Scatter(
-            x=scores[mask, 0],
-            y=scores[mask, 1],
+            x=scores[idx, 0],
+            y=scores[idx, 1],
             mode='markers',
             name=cls,
             marker=dict(size=8)
@@ -337,7 +458,8 @@ def create_animated_transitions():
     fig = go.Figure(data=initial_data, frames=frames)
     
     # Add play/pause buttons
-    fig.update_layout(
+    _apply_common_layout(
+        fig,
         updatemenus=[
             dict(
                 type='buttons',
@@ -371,41 +493,60 @@ def create_animated_transitions():
             'y': 0,
             'yanchor': 'top'
         }],
-        title='Animated PC Transitions',
-        width=800,
-        height=600,
-        template='plotly_dark'
+        title='Animated PC Transitions'
     )
     
     return fig
 
 
+# SVG scatter degrades badly past a few thousand points; larger sizes only
+# benchmark scattergl.
+SVG_MAX_POINTS = 2000
+
+
+def _write_benchmark_html(fig, path):
+    """Write one benchmark figure to HTML."""
+    # Traces were validated when the figure was built; skip the second pass
+    fig.write_html(path, include_plotlyjs='cdn', full_html=True,
+                   include_mathjax=False, auto_open=False, validate=False)
+
+
 def benchmark_performance():
-    """Benchmark rendering performance for different data sizes."""
+    """Benchmark rendering performance for different data sizes.
+    
+    Each figure is built and written serially, so every reported time is
+    that figure's own build plus write cost.
+    """
     sizes = [100, 500, 1000, 5000, 10000]
     results = {'size': [], 'svg_time': [], 'webgl_time': []}
     
+    rng = np.random.default_rng(0)
     for size in sizes:
         # Generate random data
-        X = np.random.randn(size, 2)
+        X = rng.standard_normal((size, 2), dtype=np.float32)
         
-        # Time SVG rendering
-        start = time.time()
-        fig_svg = go.Figure(go.Scatter(x=X[:, 0], y=X[:, 1], mode='markers'))
-        fig_svg.write_html(get_output_path(f'benchmark_svg_{size}.html'))
-        svg_time = time.time() - start
+        # Time SVG rendering (skipped above the scattergl threshold)
+        svg_time = None
+        if size <= SVG_MAX_POINTS:
+            start = time.time()
+            fig_svg = go.Figure(go.Scatter(x=X[:, 0], y=X[:, 1], mode='markers'))
+            _write_benchmark_html(fig_svg, get_output_path(f'benchmark_svg_{size}.html'))
+            svg_time = time.time() - start
         
         # Time WebGL rendering
         start = time.time()
-        fig_webgl = go.Figure(go.Scattergl(x=X[:, 0], y=X[:, 1], mode='markers'))
-        fig_webgl.write_html(get_output_path(f'benchmark_webgl_{size}.html'))
+        fig_webgl = go.Figure(go.Scattergl(x=X[:, 0].tolist(), y=X[:, 1].tolist(), mode='markers'))
+        _write_benchmark_html(fig_webgl, get_output_path(f'benchmark_webgl_{size}.html'))
         webgl_time = time.time() - start
         
         results['size'].append(size)
         results['svg_time'].append(svg_time)
         results['webgl_time'].append(webgl_time)
         
-        print(f"Size: {size:5d} | SVG: {svg_time:.3f}s | WebGL: {webgl_time:.3f}s | Speedup: {svg_time/webgl_time:.1f}x")
+        if svg_time is None:
+            print(f"Size: {size:5d} | SVG: skipped (> {SVG_MAX_POINTS} points, use scattergl) | WebGL: {webgl_time:.3f}s")
+        else:
+            print(f"Size: {size:5d} | SVG: {svg_time:.3f}s | WebGL: {webgl_time:.3f}s | Speedup: {svg_time/webgl_time:.1f}x")
     
     # Create performance comparison plot
     fig = go.Figure()
@@ -424,45 +565,41 @@ def benchmark_performance():
         line=dict(color='green', width=2)
     ))
     
-    fig.update_layout(
+    _apply_common_layout(
+        fig,
         title='Performance: SVG vs WebGL Rendering',
         xaxis_title='Number of Points',
         yaxis_title='Render Time (seconds)',
         xaxis_type='log',
         yaxis_type='log',
-        width=800,
-        height=500,
-        template='plotly_dark'
+        height=500
     )
     
     return fig, results
 
 
-def create_custom_modebar_demo(scores, y):
+def create_custom_modebar_demo(scores, y, groups=None, colors=COLORS):
     """Demonstrate custom modebar configuration."""
     fig = go.Figure()
     
     # Add data
-    classes = np.unique(y)
-    colors = px.colors.qualitative.Plotly
+    if groups is None:
+        groups = class_indices(y)
     
-    for i, cls in enumerate(classes):
-        mask = y == cls
+    for i, (cls, idx) in enumerate(groups.items()):
         fig.add_trace(go.Scattergl(
-            x=scores[mask, 0],
-            y=scores[mask, 1],
+            x=scores[idx, 0].tolist(),
+            y=scores[idx, 1].tolist(),
             mode='markers',
             name=cls,
             marker=dict(size=8, color=colors[i])
         ))
     
-    fig.update_layout(
+    _apply_common_layout(
+        fig,
         title='Custom Modebar Configuration',
         xaxis_title='PC1',
         yaxis_title='PC2',
-        width=800,
-        height=600,
-        template='plotly_dark',
         hovermode='x unified'
     )
     
@@ -493,55 +630,50 @@ def create_custom_modebar_demo(scores, y):
 
 def save_all_advanced_plots():
     """Generate and save all advanced feature demonstrations."""
-    # Load data
-    scores, y, variance = load_data()
-    
-    # For 3D
-    df = pd.read_csv('wine.csv')
-    feature_cols = [col for col in df.columns if col not in ['classes', 'Unnamed: 0']]
-    X = df[feature_cols].values
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
-    pca_3d = PCA(n_components=3)
-    scores_3d = pca_3d.fit_transform(X_scaled)
+    # Load data (single 4-component PCA shared by every demo)
+    scores_4d, y = load_data()
+    scores = scores_4d[:, :2]
+    scores_3d = scores_4d[:, :3]
+    groups = class_indices(y)
+    per_class = class_columns(scores_3d, groups)
     
     print("Creating Advanced Plotly Demonstrations")
     print("=" * 50)
     
     # 1. WebGL Comparison
-    fig_webgl = create_webgl_comparison(scores, y)
-    fig_webgl.write_html(get_output_path('advanced_webgl_comparison.html'))
+    fig_webgl = create_webgl_comparison(scores, y, per_class)
+    fig_webgl.write_html(get_output_path('advanced_webgl_comparison.html'), include_plotlyjs='cdn', full_html=True)
     print("✅ WebGL comparison saved")
     
     # 2. Density Contours
-    fig_density = create_density_contour_plot(scores, y)
-    fig_density.write_html(get_output_path('advanced_density_contours.html'))
+    fig_density = create_density_contour_plot(scores, y, per_class)
+    fig_density.write_html(get_output_path('advanced_density_contours.html'), include_plotlyjs='cdn', full_html=True)
     print("✅ Density contours saved")
     
     # 3. Lasso Selection
     fig_lasso, config_lasso = create_lasso_selection_demo(scores, y)
-    fig_lasso.write_html(get_output_path('advanced_lasso_selection.html'), config=config_lasso)
+    fig_lasso.write_html(get_output_path('advanced_lasso_selection.html'), config=config_lasso, include_plotlyjs='cdn', full_html=True)
     print("✅ Lasso selection demo saved")
     
     # 4. 3D with Density
-    fig_3d = create_3d_with_density(scores_3d, y)
-    fig_3d.write_html(get_output_path('advanced_3d_density.html'))
+    fig_3d = create_3d_with_density(scores_3d, y, per_class)
+    fig_3d.write_html(get_output_path('advanced_3d_density.html'), include_plotlyjs='cdn', full_html=True)
     print("✅ 3D with density saved")
     
     # 5. Animated Transitions
-    fig_animated = create_animated_transitions()
-    fig_animated.write_html(get_output_path('advanced_animated_transitions.html'))
+    fig_animated = create_animated_transitions(scores_4d, y, groups)
+    fig_animated.write_html(get_output_path('advanced_animated_transitions.html'), include_plotlyjs='cdn', full_html=True)
     print("✅ Animated transitions saved")
     
     # 6. Performance Benchmark
     print("\nRunning performance benchmarks...")
     fig_perf, perf_results = benchmark_performance()
-    fig_perf.write_html(get_output_path('advanced_performance_benchmark.html'))
+    fig_perf.write_html(get_output_path('advanced_performance_benchmark.html'), include_plotlyjs='cdn', full_html=True)
     print("✅ Performance benchmark saved")
     
     # 7. Custom Modebar
-    fig_custom, config_custom = create_custom_modebar_demo(scores, y)
-    fig_custom.write_html(get_output_path('advanced_custom_modebar.html'), config=config_custom)
+    fig_custom, config_custom = create_custom_modebar_demo(scores, y, groups)
+    fig_custom.write_html(get_output_path('advanced_custom_modebar.html'), config=config_custom, include_plotlyjs='cdn', full_html=True)
     print("✅ Custom modebar demo saved")
     
     print("\n" + "=" * 50)
@@ -557,7 +689,7 @@ def save_all_advanced_plots():
         'notes': {
             'webgl_threshold': 'Use scattergl for >1000 points',
             'export_resolution': 'Use scale=2-4 for publication quality',
-            'density_method': 'gaussian_kde from scipy.stats',
+            'density_method': 'binned KDE (histogram2d + scipy.ndimage.gaussian_filter)',
             'animation_duration': '1000ms per frame recommended'
         }
     }
@@ -19,8 +19,6 @@ import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
-from sklearn.decomposition import PCA
-from sklearn.preprocessing import StandardScaler
 from scipy import stats
 import json
 import os
@@ -36,75 +34,292 @@ def get_output_path(filename):
     return os.path.join(OUTPUT_DIR, filename)
 
 
+# Qualitative class palette, resolved once; the array form indexes
+# per-point marker colors by class code
+_COLORS = tuple(px.colors.qualitative.Plotly)
+_COLOR_ARRAY = np.asarray(_COLORS)
+
+# Traces with at least this many points render through WebGL (scattergl),
+# mirroring the minScatterGLRows=1000 threshold used by other Plotly
+# front ends. SVG stays crisper for small plots and avoids using up the
+# browser's limited number of WebGL contexts.
+MIN_SCATTERGL_ROWS = 1000
+
+
+def _scatter_cls(n):
+    """Return the 2D scatter trace class suited to n points."""
+    return go.Scattergl if n >= MIN_SCATTERGL_ROWS else go.Scatter
+
+
+# At or above this many samples the per-class sample traces are merged into
+# one trace with per-point colors, since many traces stall Plotly.js. Below
+# it each class keeps its own trace, so legend clicks toggle the class.
+MIN_MERGED_TRACE_ROWS = 1000
+
+
+# Parametric angles for confidence ellipses, shared by every call. The
+# endpoint is kept so the 'lines' trace closes on itself. 64 vertices are
+# visually indistinguishable from 100 and mean fewer SVG path nodes.
+_THETA_64 = np.linspace(0, 2*np.pi, 64)
+_UNIT_CIRCLE = {64: (np.cos(_THETA_64), np.sin(_THETA_64))}
+
+
+def _unit_circle(n_points):
+    """Return (cos(theta), sin(theta)) for n_points angles, cached per count."""
+    if n_points not in _UNIT_CIRCLE:
+        theta = np.linspace(0, 2*np.pi, n_points)
+        _UNIT_CIRCLE[n_points] = (np.cos(theta), np.sin(theta))
+    return _UNIT_CIRCLE[n_points]
+
+
 def load_and_prepare_data():
     """Load wine dataset and prepare for PCA."""
     df = pd.read_csv('wine.csv')
     
     # Separate features and classes
     feature_cols = [col for col in df.columns if col not in ['classes', 'Unnamed: 0']]
-    X = df[feature_cols].values
+    X = df[feature_cols].to_numpy(dtype=np.float32, copy=False)
     y = df['classes'].values
     feature_names = feature_cols
     
-    # Standardize features
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    # Standardize features (population std, as StandardScaler); moments in
+    # float64, result kept in float32
+    mu = X.mean(axis=0, dtype=np.float64)
+    sd = X.std(axis=0, ddof=0, dtype=np.float64)
+    sd[sd == 0] = 1.0
+    X_scaled = ((X - mu) / sd).astype(np.float32, copy=False)
     
     return X_scaled, y, feature_names, df
 
 
 def perform_pca(X_scaled, n_components=None):
-    """Perform PCA and return results."""
-    pca = PCA(n_components=n_components)
-    scores = pca.fit_transform(X_scaled)
+    """
+    Perform PCA and return results.
+    
+    Tall data (more than 4 samples per feature, as for wine) goes through
+    eigh of the small D x D covariance matrix; otherwise a thin SVD of the
+    centered data is used. Signs follow scikit-learn's convention (largest
+    loading of each component is positive), so results match
+    sklearn.decomposition.PCA.
+    """
+    n_samples, n_features = X_scaled.shape
+    mean = X_scaled.mean(axis=0)
+    Xc = X_scaled - mean
+    
+    if n_samples > 4 * n_features:
+        # Gram product in float64 (BLAS syrk via einsum), then eigh of the
+        # symmetric covariance; eigenvalues come back ascending
+        Xc64 = Xc.astype(np.float64, copy=False)
+        cov = np.einsum('ij,ik->jk', Xc64, Xc64, optimize=True) / (n_samples - 1)
+        variances, V = np.linalg.eigh(cov)
+        variances = np.maximum(variances[::-1], 0.0)
+        Vt = V[:, ::-1].T
+    else:
+        _, S, Vt = np.linalg.svd(Xc, full_matrices=False)
+        variances = S.astype(np.float64) ** 2 / (n_samples - 1)
+    
+    signs = np.sign(Vt[np.arange(Vt.shape[0]), np.argmax(np.abs(Vt), axis=1)])
+    Vt = Vt * signs[:, None]
+    
+    if n_components is None:
+        n_components = len(variances)
+    
+    # Variance bookkeeping in float64; total variance uses every component
+    explained_variance = variances[:n_components]
+    explained_variance_ratio = explained_variance / variances.sum() * 100
+    
+    # float32 end to end, so Plotly can emit the scores as f4 typed arrays
+    components = Vt[:n_components]
+    scores = (Xc @ components.T).astype(np.float32, copy=False)
     
     return {
         'scores': scores,
-        'loadings': pca.components_.T,
-        'explained_variance': pca.explained_variance_,
-        'explained_variance_ratio': pca.explained_variance_ratio_ * 100,
-        'cumulative_variance': np.cumsum(pca.explained_variance_ratio_) * 100,
-        'n_components': pca.n_components_,
-        'mean': pca.mean_,
-        'components': pca.components_
+        'loadings': components.T,
+        'explained_variance': explained_variance,
+        'explained_variance_ratio': explained_variance_ratio,
+        'cumulative_variance': np.cumsum(explained_variance_ratio),
+        'n_components': n_components,
+        'mean': mean,
+        'components': components
     }
 
 
-def calculate_confidence_ellipse(x, y, confidence=0.95):
+def class_groups(y):
+    """Return (classes, inverse, masks): labels, per-sample class codes and boolean masks."""
+    classes, inverse = np.unique(y, return_inverse=True)
+    masks = [inverse == i for i in range(len(classes))]
+    return classes, inverse, masks
+
+
+def pc_axis_labels(pca_results):
+    """Axis titles 'PCk (xx.x%)' for every component."""
+    return [f"PC{i+1} ({v:.1f}%)" for i, v in enumerate(pca_results['explained_variance_ratio'])]
+
+
+def _add_class_legend(fig, classes, trace_cls=go.Scatter, **marker):
     """
-    Calculate confidence ellipse parameters.
-    Reference: Johnson & Wichern (2007), Ch. 4
+    Add one empty trace per class so the legend lists the classes.
+    
+    Used when the samples are drawn as a single trace with per-point
+    colors; these placeholders only populate the legend.
+    """
+    empty = dict(z=[None]) if trace_cls is go.Scatter3d else {}
+    for i, cls in enumerate(classes):
+        fig.add_trace(trace_cls(
+            x=[None], y=[None], **empty,
+            mode='markers',
+            name=cls,
+            legendgroup=str(cls),
+            marker=dict(color=_COLORS[i % len(_COLORS)], **marker)
+        ))
+
+
+def _add_class_samples(fig, trace_cls, groups, coords, text=None, marker=None, **trace):
     """
-    mean_x, mean_y = np.mean(x), np.mean(y)
-    cov_matrix = np.cov(x, y)
+    Add the samples of every class to fig.
     
-    # Chi-square value for confidence level
-    chi2_val = stats.chi2.ppf(confidence, df=2)
+    Below MIN_MERGED_TRACE_ROWS samples each class gets its own trace
+    (legendgroup = class) so the legend toggles it; above, all samples go
+    into one per-point colored trace plus placeholder legend entries.
+    coords maps 'x'/'y'/'z' to full-length arrays; text is optional.
+    """
+    classes, codes, masks = groups
+    marker = marker or {}
+    
+    if len(codes) >= MIN_MERGED_TRACE_ROWS:
+        fig.add_trace(trace_cls(
+            **coords,
+            text=text,
+            marker=dict(marker, color=_COLOR_ARRAY[codes % len(_COLORS)]),
+            showlegend=False,
+            **trace
+        ))
+        legend_cls = go.Scatter3d if trace_cls is go.Scatter3d else go.Scatter
+        _add_class_legend(fig, classes, legend_cls, **marker)
+        return
+    
+    for i, cls in enumerate(classes):
+        mask = masks[i]
+        fig.add_trace(trace_cls(
+            **{axis: values[mask] for axis, values in coords.items()},
+            text=None if text is None else text[mask],
+            name=cls,
+            legendgroup=str(cls),
+            marker=dict(marker, color=_COLORS[i % len(_COLORS)]),
+            **trace
+        ))
+
+
+def _add_loading_vectors(fig, lx, ly, feature_names, font_size=10):
+    """
+    Draw loading vectors from the origin as two traces instead of one
+    annotation per feature.
     
-    # Eigenvalues and eigenvectors for ellipse orientation
-    eigenvalues, eigenvectors = np.linalg.eig(cov_matrix)
+    All arrows share one line trace, separated by NaN breaks, with an
+    arrow marker at each tip; a text trace labels the tips.
+    """
+    n = len(lx)
+    xs = np.zeros(3 * n)
+    ys = np.zeros(3 * n)
+    xs[1::3], ys[1::3] = lx, ly
+    xs[2::3] = ys[2::3] = np.nan
     
-    # Ellipse parameters
-    angle = np.degrees(np.arctan2(eigenvectors[1, 0], eigenvectors[0, 0]))
-    width = 2 * np.sqrt(chi2_val * eigenvalues[0])
-    height = 2 * np.sqrt(chi2_val * eigenvalues[1])
+    # Arrowheads only at the tips, oriented along each segment
+    sizes = np.zeros(3 * n)
+    sizes[1::3] = 10
     
-    # Generate ellipse points
-    theta = np.linspace(0, 2*np.pi, 100)
-    ellipse_x = width/2 * np.cos(theta)
-    ellipse_y = height/2 * np.sin(theta)
+    fig.add_trace(go.Scatter(
+        x=xs,
+        y=ys,
+        mode='lines+markers',
+        line=dict(color='red', width=2),
+        marker=dict(symbol='arrow', angleref='previous', size=sizes, color='red'),
+        showlegend=False,
+        hoverinfo='skip'
+    ))
+    
+    # Push each label away from the origin
+    textposition = np.char.add(np.where(ly >= 0, 'top ', 'bottom '), np.where(lx >= 0, 'right', 'left'))
+    fig.add_trace(go.Scatter(
+        x=lx,
+        y=ly,
+        mode='text',
+        text=feature_names,
+        textposition=textposition,
+        textfont=dict(size=font_size, color='red'),
+        showlegend=False,
+        hovertemplate='<b>%{text}</b><br>(%{x:.3f}, %{y:.3f})<extra></extra>'
+    ))
+
+
+def calculate_confidence_ellipse(x, y, confidence=0.95, n_points=64, adaptive=False):
+    """
+    Calculate the confidence ellipse of a single group of points.
+    Reference: Johnson & Wichern (2007), Ch. 4
+    
+    Thin wrapper over calculate_confidence_ellipses with one class.
+    Degenerate input (fewer than 3 points or a near-singular covariance)
+    returns empty arrays, so callers can skip the trace.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    ellipses_x, ellipses_y, valid = calculate_confidence_ellipses(
+        x, np.asarray(y, dtype=np.float64), np.zeros(len(x), dtype=np.intp), 1,
+        confidence=confidence, n_points=n_points, adaptive=adaptive
+    )
+    if not valid[0]:
+        return np.empty(0), np.empty(0)
+    return ellipses_x[0], ellipses_y[0]
+
+
+def calculate_confidence_ellipses(x, y, codes, n_classes, confidence=0.95, n_points=64, adaptive=False):
+    """
+    Calculate confidence ellipses for all classes in one batched pass.
+    
+    Class means and covariances come from bincount reductions over the
+    integer class codes; the closed-form 2x2 eigendecomposition and the
+    rotated points are broadcast over classes. Returns (ellipse_x, ellipse_y,
+    valid), the first two of shape (n_classes, n_points). valid is False for
+    classes with fewer than 3 samples or a near-singular covariance; their
+    rows are meaningless and should be skipped by the caller.
+    
+    adaptive=True scales the vertex count with the ellipse area,
+    min(100, max(32, 4*sqrt(width*height))), instead of using n_points.
+    All classes share one array, so the largest valid ellipse sets the count.
+    Reference: Johnson & Wichern (2007), Ch. 4
+    """
+    counts = np.bincount(codes, minlength=n_classes)
+    dof = np.maximum(counts - 1, 1)
+    mean_x = np.bincount(codes, weights=x, minlength=n_classes) / np.maximum(counts, 1)
+    mean_y = np.bincount(codes, weights=y, minlength=n_classes) / np.maximum(counts, 1)
     
-    # Rotate ellipse
-    rotation_matrix = np.array([
-        [np.cos(np.radians(angle)), -np.sin(np.radians(angle))],
-        [np.sin(np.radians(angle)), np.cos(np.radians(angle))]
-    ])
+    dx = x - mean_x[codes]
+    dy = y - mean_y[codes]
+    vx = np.bincount(codes, weights=dx * dx, minlength=n_classes) / dof
+    vy = np.bincount(codes, weights=dy * dy, minlength=n_classes) / dof
+    cxy = np.bincount(codes, weights=dx * dy, minlength=n_classes) / dof
     
-    ellipse_points = np.dot(rotation_matrix, np.array([ellipse_x, ellipse_y]))
-    ellipse_x = ellipse_points[0, :] + mean_x
-    ellipse_y = ellipse_points[1, :] + mean_y
+    chi2_val = stats.chi2.ppf(confidence, df=2)
     
-    return ellipse_x, ellipse_y
+    # Closed-form eigendecomposition, batched over classes
+    angle = 0.5 * np.arctan2(2 * cxy, vx - vy)
+    half_trace = (vx + vy) / 2
+    det = vx * vy - cxy * cxy
+    disc = np.sqrt(np.maximum(half_trace * half_trace - det, 0.0))
+    half_width = np.sqrt(chi2_val * (half_trace + disc))
+    half_height = np.sqrt(chi2_val * np.maximum(half_trace - disc, 0.0))
+    
+    valid = (counts > 2) & (det > 1e-12 * (vx + vy) ** 2)
+    if adaptive and valid.any():
+        area = np.max(4 * half_width[valid] * half_height[valid])
+        n_points = min(100, max(32, int(4 * np.sqrt(area))))
+    
+    # Rotation folded into per-class coefficients, broadcast against theta
+    cos_t, sin_t = _unit_circle(n_points)
+    c, s = np.cos(angle)[:, None], np.sin(angle)[:, None]
+    w, h = half_width[:, None], half_height[:, None]
+    ellipses_x = (w * c) * cos_t - (h * s) * sin_t + mean_x[:, None]
+    ellipses_y = (w * s) * cos_t + (h * c) * sin_t + mean_y[:, None]
+    return ellipses_x, ellipses_y, valid
 
 
 def calculate_smart_labels(scores, max_labels=10):
@@ -112,66 +327,78 @@ def calculate_smart_labels(scores, max_labels=10):
     Select points furthest from origin for labeling.
     This preserves the beloved smart label selection feature.
     """
-    distances = np.sqrt(scores[:, 0]**2 + scores[:, 1]**2)
-    top_indices = np.argsort(distances)[-max_labels:]
+    # Rank on squared distance; only the top max_labels are needed, so a
+    # partial partition (O(N)) replaces a full sort
+    d2 = scores[:, 0]**2 + scores[:, 1]**2
+    if max_labels >= len(d2):
+        return np.arange(len(d2))
+    top_indices = np.argpartition(d2, -max_labels)[-max_labels:]
     return top_indices
 
 
-def create_scores_plot(pca_results, y, pc1=0, pc2=1, show_ellipses=True, max_labels=10):
-    """Create interactive scores plot with smart labels and confidence ellipses."""
+def create_scores_plot(pca_results, y, pc1=0, pc2=1, show_ellipses=True, max_labels=10, groups=None,
+                       axis_labels=None, n_points=64, adaptive=False):
+    """
+    Create interactive scores plot with smart labels and confidence ellipses.
+    
+    n_points and adaptive set the ellipse vertex count, as in
+    calculate_confidence_ellipses.
+    """
+    if axis_labels is None:
+        axis_labels = pc_axis_labels(pca_results)
     fig = go.Figure()
     
     scores = pca_results['scores']
-    classes = np.unique(y)
-    colors = px.colors.qualitative.Plotly
+    if groups is None:
+        groups = class_groups(y)
+    classes, codes, _ = groups
     
     # Calculate smart labels
     smart_label_indices = calculate_smart_labels(scores[:, [pc1, pc2]], max_labels)
+    label_mask = np.zeros(len(scores), dtype=bool)
+    label_mask[smart_label_indices] = True
+    
+    # Confidence ellipses for every class in one batched computation
+    if show_ellipses:
+        ellipses_x, ellipses_y, ellipse_valid = calculate_confidence_ellipses(
+            scores[:, pc1], scores[:, pc2], codes, len(classes), confidence=0.95,
+            n_points=n_points, adaptive=adaptive
+        )
     
-    for i, cls in enumerate(classes):
-        mask = y == cls
-        class_scores = scores[mask]
-        
-        # Create text array - only show labels for smart selection
-        text = [''] * len(class_scores)
-        indices = np.where(mask)[0]
-        for j, idx in enumerate(indices):
-            if idx in smart_label_indices:
-                text[j] = f'Sample {idx}'
-        
-        # Add scatter trace
-        fig.add_trace(go.Scatter(
-            x=class_scores[:, pc1],
-            y=class_scores[:, pc2],
-            mode='markers+text',
-            name=cls,
-            text=text,
-            textposition='top center',
-            marker=dict(size=8, color=colors[i % len(colors)]),
-            hovertemplate=f'<b>%{{text}}</b><br>PC{pc1+1}: %{{x:.2f}}<br>PC{pc2+1}: %{{y:.2f}}<extra></extra>'
-        ))
-        
-        # Add confidence ellipse
-        if show_ellipses and len(class_scores) > 2:
-            ellipse_x, ellipse_y = calculate_confidence_ellipse(
-                class_scores[:, pc1], 
-                class_scores[:, pc2], 
-                confidence=0.95
-            )
-            fig.add_trace(go.Scatter(
-                x=ellipse_x,
-                y=ellipse_y,
-                mode='lines',
-                line=dict(color=colors[i % len(colors)], dash='dash', width=2),
-                showlegend=False,
-                hoverinfo='skip'
-            ))
+    hover = f'<b>%{{text}}</b><br>PC{pc1+1}: %{{x:.2f}}<br>PC{pc2+1}: %{{y:.2f}}<extra></extra>'
+    
+    # Text array - only show labels for smart selection
+    text = np.where(label_mask, np.char.add('Sample ', np.arange(len(scores)).astype(str)), '')
+    
+    _add_class_samples(
+        fig, _scatter_cls(len(scores)), groups,
+        dict(x=scores[:, pc1], y=scores[:, pc2]),
+        text=text,
+        marker=dict(size=8),
+        mode='markers+text',
+        textposition='top center',
+        hovertemplate=hover
+    )
+    
+    # Add confidence ellipses
+    if show_ellipses:
+        for i, cls in enumerate(classes):
+            if ellipse_valid[i]:
+                fig.add_trace(go.Scatter(
+                    x=ellipses_x[i],
+                    y=ellipses_y[i],
+                    mode='lines',
+                    line=dict(color=_COLORS[i % len(_COLORS)], dash='dash', width=2),
+                    legendgroup=str(cls),
+                    showlegend=False,
+                    hoverinfo='skip'
+                ))
     
     # Update layout
     fig.update_layout(
         title='PCA Scores Plot with Smart Labels and Confidence Ellipses',
-        xaxis_title=f"PC{pc1+1} ({pca_results['explained_variance_ratio'][pc1]:.1f}%)",
-        yaxis_title=f"PC{pc2+1} ({pca_results['explained_variance_ratio'][pc2]:.1f}%)",
+        xaxis_title=axis_labels[pc1],
+        yaxis_title=axis_labels[pc2],
         hovermode='closest',
         width=800,
         height=600,
@@ -190,7 +417,7 @@ def create_scree_plot(pca_results):
     fig = make_subplots(specs=[[{"secondary_y": True}]])
     
     n_components = pca_results['n_components']
-    x = list(range(1, n_components + 1))
+    x = np.arange(1, n_components + 1, dtype=np.int32)
     
     # Bar chart for explained variance
     fig.add_trace(
@@ -198,7 +425,7 @@ def create_scree_plot(pca_results):
             x=x,
             y=pca_results['explained_variance_ratio'],
             name='Explained Variance',
-            marker_color=px.colors.qualitative.Plotly[:n_components]
+            marker_color=_COLORS[:n_components]
         ),
         secondary_y=False
     )
@@ -256,7 +483,7 @@ def create_loadings_plot(pca_results, feature_names, pc=0, plot_type='bar'):
         chart_type = 'Bar Chart'
     else:
         fig = go.Figure(go.Scatter(
-            x=list(range(len(feature_names))),
+            x=np.arange(len(feature_names), dtype=np.int32),
             y=loadings,
             mode='lines+markers',
             line=dict(color='blue', width=2),
@@ -283,7 +510,7 @@ def create_loadings_plot(pca_results, feature_names, pc=0, plot_type='bar'):
     return fig
 
 
-def create_biplot(pca_results, y, feature_names, pc1=0, pc2=1, scale=0.5):
+def create_biplot(pca_results, y, feature_names, pc1=0, pc2=1, scale=0.5, groups=None, axis_labels=None):
     """
     Create biplot with properly scaled vectors.
     Reference: Gabriel (1971) - scale parameter controls emphasis
@@ -291,6 +518,8 @@ def create_biplot(pca_results, y, feature_names, pc1=0, pc2=1, scale=0.5):
     scale=1: column-metric preserving  
     scale=0.5: symmetric (default)
     """
+    if axis_labels is None:
+        axis_labels = pc_axis_labels(pca_results)
     fig = go.Figure()
     
     scores = pca_results['scores']
@@ -307,46 +536,32 @@ def create_biplot(pca_results, y, feature_names, pc1=0, pc2=1, scale=0.5):
     scaled_loadings = loadings * alpha
     
     # Add scores
-    classes = np.unique(y)
-    colors = px.colors.qualitative.Plotly
-    
-    for i, cls in enumerate(classes):
-        mask = y == cls
-        fig.add_trace(go.Scatter(
-            x=scaled_scores[mask, pc1],
-            y=scaled_scores[mask, pc2],
-            mode='markers',
-            name=cls,
-            marker=dict(size=6, color=colors[i % len(colors)], opacity=0.7)
-        ))
+    if groups is None:
+        groups = class_groups(y)
+    
+    _add_class_samples(
+        fig, _scatter_cls(len(scores)), groups,
+        dict(x=scaled_scores[:, pc1], y=scaled_scores[:, pc2]),
+        marker=dict(size=6, opacity=0.7),
+        mode='markers'
+    )
     
     # Add loading vectors
     max_score = np.max(np.abs(scaled_scores[:, [pc1, pc2]]))
     scale_factor = max_score * 0.8 / np.max(np.abs(scaled_loadings[:, [pc1, pc2]]))
     
-    for i, feature in enumerate(feature_names):
-        fig.add_annotation(
-            x=scaled_loadings[i, pc1] * scale_factor,
-            y=scaled_loadings[i, pc2] * scale_factor,
-            ax=0, ay=0,
-            xref='x', yref='y',
-            axref='x', ayref='y',
-            showarrow=True,
-            arrowhead=2,
-            arrowsize=1,
-            arrowwidth=2,
-            arrowcolor='red',
-            text=feature,
-            font=dict(size=10),
-            bgcolor='rgba(255,255,255,0.7)',
-            bordercolor='red',
-            borderwidth=1
-        )
+    _add_loading_vectors(
+        fig,
+        scaled_loadings[:, pc1] * scale_factor,
+        scaled_loadings[:, pc2] * scale_factor,
+        feature_names,
+        font_size=10
+    )
     
     fig.update_layout(
         title=f'Biplot (Gabriel scaling, α={scale})',
-        xaxis_title=f"PC{pc1+1} ({pca_results['explained_variance_ratio'][pc1]:.1f}%)",
-        yaxis_title=f"PC{pc2+1} ({pca_results['explained_variance_ratio'][pc2]:.1f}%)",
+        xaxis_title=axis_labels[pc1],
+        yaxis_title=axis_labels[pc2],
         width=800,
         height=600,
         template='plotly_dark'
@@ -359,41 +574,43 @@ def create_biplot(pca_results, y, feature_names, pc1=0, pc2=1, scale=0.5):
     return fig
 
 
-def create_3d_scores_plot(pca_results, y, pc1=0, pc2=1, pc3=2):
+def create_3d_scores_plot(pca_results, y, pc1=0, pc2=1, pc3=2, groups=None, axis_labels=None):
     """Create interactive 3D scores plot."""
+    if axis_labels is None:
+        axis_labels = pc_axis_labels(pca_results)
     scores = pca_results['scores']
     
     fig = go.Figure()
     
-    classes = np.unique(y)
-    colors = px.colors.qualitative.Plotly
-    
-    for i, cls in enumerate(classes):
-        mask = y == cls
-        fig.add_trace(go.Scatter3d(
-            x=scores[mask, pc1],
-            y=scores[mask, pc2],
-            z=scores[mask, pc3],
-            mode='markers',
-            name=cls,
-            marker=dict(
-                size=5,
-                color=colors[i % len(colors)],
-                opacity=0.8
-            ),
-            text=[f'Sample {j}' for j in range(sum(mask))],
-            hovertemplate='<b>%{text}</b><br>' +
-                         f'PC{pc1+1}: %{{x:.2f}}<br>' +
-                         f'PC{pc2+1}: %{{y:.2f}}<br>' +
-                         f'PC{pc3+1}: %{{z:.2f}}<extra></extra>'
-        ))
+    if groups is None:
+        groups = class_groups(y)
+    masks = groups[2]
+    
+    hover = ('<b>%{text}</b><br>' +
+             f'PC{pc1+1}: %{{x:.2f}}<br>' +
+             f'PC{pc2+1}: %{{y:.2f}}<br>' +
+             f'PC{pc3+1}: %{{z:.2f}}<extra></extra>')
+    
+    # Samples are numbered within their class
+    sample_ids = np.empty(len(scores), dtype=np.int64)
+    for mask in masks:
+        sample_ids[mask] = np.arange(np.count_nonzero(mask))
+    
+    _add_class_samples(
+        fig, go.Scatter3d, groups,
+        dict(x=scores[:, pc1], y=scores[:, pc2], z=scores[:, pc3]),
+        text=np.char.add('Sample ', sample_ids.astype(str)),
+        marker=dict(size=5, opacity=0.8),
+        mode='markers',
+        hovertemplate=hover
+    )
     
     fig.update_layout(
         title='3D PCA Scores Plot',
         scene=dict(
-            xaxis_title=f"PC{pc1+1} ({pca_results['explained_variance_ratio'][pc1]:.1f}%)",
-            yaxis_title=f"PC{pc2+1} ({pca_results['explained_variance_ratio'][pc2]:.1f}%)",
-            zaxis_title=f"PC{pc3+1} ({pca_results['explained_variance_ratio'][pc3]:.1f}%)",
+            xaxis_title=axis_labels[pc1],
+            yaxis_title=axis_labels[pc2],
+            zaxis_title=axis_labels[pc3],
             camera=dict(
                 eye=dict(x=1.5, y=1.5, z=1.5)
             )
@@ -406,8 +623,10 @@ def create_3d_scores_plot(pca_results, y, pc1=0, pc2=1, pc3=2):
     return fig
 
 
-def create_circle_of_correlations(pca_results, feature_names, pc1=0, pc2=1):
+def create_circle_of_correlations(pca_results, feature_names, pc1=0, pc2=1, axis_labels=None):
     """Create circle of correlations plot."""
+    if axis_labels is None:
+        axis_labels = pc_axis_labels(pca_results)
     loadings = pca_results['loadings']
     
     fig = go.Figure()
@@ -424,29 +643,12 @@ def create_circle_of_correlations(pca_results, feature_names, pc1=0, pc2=1):
     ))
     
     # Add loading vectors
-    for i, feature in enumerate(feature_names):
-        fig.add_annotation(
-            x=loadings[i, pc1],
-            y=loadings[i, pc2],
-            ax=0, ay=0,
-            xref='x', yref='y',
-            axref='x', ayref='y',
-            showarrow=True,
-            arrowhead=2,
-            arrowsize=1,
-            arrowwidth=2,
-            arrowcolor='red',
-            text=feature,
-            font=dict(size=9),
-            bgcolor='rgba(255,255,255,0.8)',
-            bordercolor='red',
-            borderwidth=1
-        )
+    _add_loading_vectors(fig, loadings[:, pc1], loadings[:, pc2], feature_names, font_size=9)
     
     fig.update_layout(
         title='Circle of Correlations',
-        xaxis_title=f"PC{pc1+1} ({pca_results['explained_variance_ratio'][pc1]:.1f}%)",
-        yaxis_title=f"PC{pc2+1} ({pca_results['explained_variance_ratio'][pc2]:.1f}%)",
+        xaxis_title=axis_labels[pc1],
+        yaxis_title=axis_labels[pc2],
         xaxis=dict(range=[-1.2, 1.2], zeroline=True, zerolinecolor='gray'),
         yaxis=dict(range=[-1.2, 1.2], zeroline=True, zerolinecolor='gray'),
         width=600,
@@ -477,21 +679,27 @@ def save_all_plots():
         print(f"  PC{i+1}: {var:.1f}%")
     print(f"\nCumulative Variance (first 5 PCs): {pca_results['cumulative_variance'][4]:.1f}%")
     
+    # Class labels, codes and masks, and the PC axis titles, are shared
+    # by every plot
+    groups = class_groups(y)
+    axis_labels = pc_axis_labels(pca_results)
+    
     # Create all plots
     plots = {
-        'scores_plot': create_scores_plot(pca_results, y),
+        'scores_plot': create_scores_plot(pca_results, y, groups=groups, axis_labels=axis_labels),
         'scree_plot': create_scree_plot(pca_results),
         'loadings_bar': create_loadings_plot(pca_results, feature_names, pc=0, plot_type='bar'),
         'loadings_line': create_loadings_plot(pca_results, feature_names, pc=0, plot_type='line'),
-        'biplot': create_biplot(pca_results, y, feature_names),
-        '3d_scores': create_3d_scores_plot(pca_results, y),
-        'circle_correlations': create_circle_of_correlations(pca_results, feature_names)
+        'biplot': create_biplot(pca_results, y, feature_names, groups=groups, axis_labels=axis_labels),
+        '3d_scores': create_3d_scores_plot(pca_results, y, groups=groups, axis_labels=axis_labels),
+        'circle_correlations': create_circle_of_correlations(pca_results, feature_names, axis_labels=axis_labels)
     }
     
-    # Save plots as HTML
+    # Save plots as HTML; plotly.js is loaded from the CDN rather than
+    # inlined (~3 MB) in every file
     for name, fig in plots.items():
         filename = get_output_path(f"plotly_{name}.html")
-        fig.write_html(filename)
+        fig.write_html(filename, include_plotlyjs='cdn', full_html=True)
         print(f"Saved: {filename}")
     
     # Save PCA results as JSON for validation